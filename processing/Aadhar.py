@@ -1,22 +1,203 @@
 import easyocr
+import os
 import re
 import sys
+import tempfile
+import time
+import torch
 
 # Set the encoding to utf-8
 sys.stdout.reconfigure(encoding='utf-8')
 
-def extract_aadhaar_details(image_path):
+# Inference runtime for the EasyOCR models:
+#   torch   - EasyOCR's own models, int8 dynamic quantized on CPU (the default)
+#   float32 - unquantized PyTorch models on CPU, the accuracy reference
+#   onnx    - int8 models exported with --export-onnx, run on ONNX Runtime (CPU)
+RUNTIME = os.environ.get('EASYOCR_RUNTIME', 'torch')
+
+# Let EasyOCR pick CUDA/MPS when available, set EASYOCR_GPU=0 to force CPU.
+# Only used by the torch runtime
+USE_GPU = os.environ.get('EASYOCR_GPU', '1') == '1'
+
+# Intra-op threads for PyTorch and ONNX Runtime on CPU, 0 keeps their defaults
+INTRA_OP_THREADS = int(os.environ.get('EASYOCR_THREADS', '0'))
+
+# Where --export-onnx writes the int8 models for the onnx runtime
+ONNX_MODEL_DIR = os.environ.get('EASYOCR_ONNX_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models'))
+ONNX_DETECTOR_PATH = os.path.join(ONNX_MODEL_DIR, 'craft_int8.onnx')
+ONNX_RECOGNIZER_PATH = os.path.join(ONNX_MODEL_DIR, 'english_g2_int8.onnx')
+
+_readers = {}
+
+class _MeanPool(torch.nn.Module):
+    """
+    Stand-in for the recognizer's AdaptiveAvgPool2d((None, 1)), which ONNX
+    can't export with a variable input width. Pooling the last axis down to
+    a single value is a plain mean.
+    """
+    def forward(self, x):
+        return x.mean(dim=3, keepdim=True)
+
+class OnnxDetector(torch.nn.Module):
+    """
+    CRAFT text detector on ONNX Runtime, called by EasyOCR in place of the
+    PyTorch model
+    """
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+
+    def forward(self, x):
+        scores = self.session.run(['scores'], {'image': x.numpy()})[0]
+        # EasyOCR only reads the score maps, the feature map is for the refiner
+        return torch.from_numpy(scores), None
+
+class OnnxRecognizer(torch.nn.Module):
+    """
+    Text recognizer on ONNX Runtime, called by EasyOCR in place of the
+    PyTorch model
+    """
+    def __init__(self, session):
+        super().__init__()
+        self.session = session
+
+    def forward(self, image, text):
+        # The exported model has no text input, the recognizer never reads it
+        return torch.from_numpy(self.session.run(None, {'image': image.numpy()})[0])
+
+def export_onnx_models(calibration_images):
+    """
+    Export EasyOCR's detector and recognizer to int8 ONNX models for the onnx
+    runtime. The detector is statically quantized, so it needs a handful of
+    sample cards to calibrate its activation ranges. The recognizer is
+    dynamically quantized.
+    
+    Args:
+        calibration_images (list): Paths to representative Aadhaar card images
+    
+    Returns:
+        tuple: Paths of the detector and recognizer models
+    """
+    import cv2
+    import numpy as np
+    from easyocr.config import imgH
+    from easyocr.imgproc import normalizeMeanVariance, resize_aspect_ratio
+    from easyocr.utils import reformat_input
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    class CalibrationImages(CalibrationDataReader):
+        def __init__(self, images):
+            self.images = iter(images)
+
+        def get_next(self):
+            image = next(self.images, None)
+            return {'image': image} if image is not None else None
+    
+    # Detector inputs prepared the same way readtext prepares them
+    images = []
+    for image_path in calibration_images:
+        image, _ = reformat_input(image_path)
+        resized, _, _ = resize_aspect_ratio(image, 2560, interpolation=cv2.INTER_LINEAR, mag_ratio=1.)
+        images.append(np.transpose(normalizeMeanVariance(resized), (2, 0, 1))[np.newaxis])
+    
+    reader = easyocr.Reader(['en'], gpu=False, quantize=False)
+    os.makedirs(ONNX_MODEL_DIR, exist_ok=True)
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        detector_path = os.path.join(tmp_dir, 'craft.onnx')
+        torch.onnx.export(reader.detector, (torch.randn(1, 3, 320, 480),), detector_path,
+                          input_names=['image'], output_names=['scores', 'feature'],
+                          dynamic_axes={'image': {0: 'batch', 2: 'height', 3: 'width'},
+                                        'scores': {0: 'batch', 1: 'score_height', 2: 'score_width'}},
+                          opset_version=17, dynamo=False)
+        quant_pre_process(detector_path, detector_path)
+        quantize_static(detector_path, ONNX_DETECTOR_PATH, CalibrationImages(images),
+                        quant_format=QuantFormat.QDQ, activation_type=QuantType.QUInt8,
+                        weight_type=QuantType.QInt8)
+    
+        recognizer_path = os.path.join(tmp_dir, 'recognizer.onnx')
+        recognizer = reader.recognizer
+        recognizer.AdaptiveAvgPool = _MeanPool()
+        torch.onnx.export(recognizer, (torch.zeros(1, 1, imgH, 256), torch.zeros(1, 26, dtype=torch.long)),
+                          recognizer_path, input_names=['image', 'text'], output_names=['preds'],
+                          dynamic_axes={'image': {0: 'batch', 3: 'width'}, 'preds': {0: 'batch', 1: 'steps'}},
+                          opset_version=17, dynamo=False)
+        # Convolutions stay float32, ONNX Runtime's dynamic int8 convolution
+        # is slower than its float one
+        quantize_dynamic(recognizer_path, ONNX_RECOGNIZER_PATH, weight_type=QuantType.QInt8,
+                         op_types_to_quantize=['MatMul', 'Gemm', 'LSTM'])
+    
+    return ONNX_DETECTOR_PATH, ONNX_RECOGNIZER_PATH
+
+def _onnx_reader():
+    """
+    Build an EasyOCR reader whose detector and recognizer run the exported
+    int8 models on ONNX Runtime
+    
+    Returns:
+        easyocr.Reader: Reader ready for inference
+    """
+    import onnxruntime
+    
+    if not (os.path.exists(ONNX_DETECTOR_PATH) and os.path.exists(ONNX_RECOGNIZER_PATH)):
+        raise FileNotFoundError(f"No ONNX models in {ONNX_MODEL_DIR}, run: python Aadhar.py --export-onnx <image> [<image> ...]")
+    
+    options = onnxruntime.SessionOptions()
+    options.intra_op_num_threads = INTRA_OP_THREADS
+    providers = ['CPUExecutionProvider']
+    
+    # The reader still does the pre- and post-processing, only the two
+    # models are swapped out
+    reader = easyocr.Reader(['en'], gpu=False, quantize=False)
+    reader.detector = OnnxDetector(onnxruntime.InferenceSession(ONNX_DETECTOR_PATH, options, providers=providers))
+    reader.recognizer = OnnxRecognizer(onnxruntime.InferenceSession(ONNX_RECOGNIZER_PATH, options, providers=providers))
+    return reader
+
+def get_reader(runtime=RUNTIME, gpu=USE_GPU):
+    """
+    Get a cached EasyOCR reader
+    
+    Args:
+        runtime (str): 'torch', 'float32' or 'onnx', see RUNTIME
+        gpu (bool): Use a GPU if one is available (torch runtime only)
+    
+    Returns:
+        easyocr.Reader: Reader ready for inference
+    """
+    key = (runtime, gpu)
+    if key in _readers:
+        return _readers[key]
+    
+    if INTRA_OP_THREADS > 0:
+        torch.set_num_threads(INTRA_OP_THREADS)
+    
+    if runtime == 'torch':
+        reader = easyocr.Reader(['en'], gpu=gpu)
+    elif runtime == 'float32':
+        reader = easyocr.Reader(['en'], gpu=False, quantize=False)
+    elif runtime == 'onnx':
+        reader = _onnx_reader()
+    else:
+        raise ValueError(f"Unknown EasyOCR runtime: {runtime}")
+    
+    _readers[key] = reader
+    return reader
+
+def extract_aadhaar_details(image_path, runtime=RUNTIME, gpu=USE_GPU):
     """
     Extract name, Aadhaar number, and DOB from an Aadhaar card using EasyOCR
     
     Args:
         image_path (str): Path to the Aadhaar card image
+        runtime (str): 'torch', 'float32' or 'onnx', see RUNTIME
+        gpu (bool): Use a GPU if one is available (torch runtime only)
     
     Returns:
         dict: Extracted information
     """
     # Initialize EasyOCR
-    reader = easyocr.Reader(['en'])
+    reader = get_reader(runtime, gpu)
     
     # Get all text from the image
     results = reader.readtext(image_path, detail=0)
@@ -92,8 +273,68 @@ def extract_aadhaar_details(image_path):
     
     return aadhaar_details
 
+def compare_quantized_accuracy(image_paths, runtimes=('torch', 'onnx')):
+    """
+    Compare the int8 runtimes against the float32 models on a set of cards
+    
+    Args:
+        image_paths (list): Paths to the benchmark Aadhaar card images
+        runtimes (tuple): Runtimes to check against float32
+    
+    Returns:
+        dict: Per-field agreement rate with float32 for each runtime, and
+        average latency per card for each runtime including float32
+    """
+    fields = ['name', 'id_number', 'dob']
+    matches = {runtime: {field: 0 for field in fields} for runtime in runtimes}
+    latency = {runtime: 0.0 for runtime in ('float32',) + tuple(runtimes)}
+    
+    # Everything runs on CPU, the only place the int8 models apply. Load the
+    # readers before timing so startup isn't counted
+    for runtime in latency:
+        get_reader(runtime, gpu=False)
+    
+    for image_path in image_paths:
+        start = time.perf_counter()
+        baseline = extract_aadhaar_details(image_path, runtime='float32', gpu=False)
+        latency['float32'] += time.perf_counter() - start
+    
+        for runtime in runtimes:
+            start = time.perf_counter()
+            details = extract_aadhaar_details(image_path, runtime=runtime, gpu=False)
+            latency[runtime] += time.perf_counter() - start
+    
+            for field in fields:
+                if baseline[field] == details[field]:
+                    matches[runtime][field] += 1
+    
+    count = max(len(image_paths), 1)
+    return {
+        'cards': len(image_paths),
+        'agreement': {runtime: {field: matches[runtime][field] / count for field in fields}
+                      for runtime in runtimes},
+        'avg_latency': {runtime: total / count for runtime, total in latency.items()}
+    }
+
 # Example usage
 if __name__ == "__main__":
+    # python Aadhar.py --export-onnx <image> [<image> ...]
+    if len(sys.argv) > 2 and sys.argv[1] == '--export-onnx':
+        for path in export_onnx_models(sys.argv[2:]):
+            print(f"Wrote {path}")
+        sys.exit(0)
+    
+    # python Aadhar.py --compare <image> [<image> ...]
+    if len(sys.argv) > 2 and sys.argv[1] == '--compare':
+        report = compare_quantized_accuracy(sys.argv[2:])
+        print(f"Cards: {report['cards']}")
+        for runtime, agreement in report['agreement'].items():
+            for field, rate in agreement.items():
+                print(f"{runtime} {field} agreement with float32: {rate:.1%}")
+        for runtime, seconds in report['avg_latency'].items():
+            print(f"{runtime} latency per card: {seconds:.2f}s")
+        sys.exit(0)
+    
     image_path = r'processing\mm.jpg'
     result = extract_aadhaar_details(image_path)
     
@@ -0,0 +1,472 @@
+# processing/bank_matcher.py
+from collections import deque
+
+# IFSC bank code (first 4 characters of an IFSC) -> bank name. A curated
+# subset of the RBI IFSC master list (including banks since merged, whose
+# codes still appear on older statements), not generated from it, so a code
+# missing here is not necessarily invalid. Regional rural and co-operative
+# banks that only issue IFSCs under a sponsor bank's code aren't listed.
+IFSC_BANK_CODES = {
+    'ABHY': 'Abhyudaya Co-operative Bank',
+    'ABPB': 'Aditya Birla Idea Payments Bank',
+    'ADBK': 'Adarsh Co-operative Urban Bank',
+    'ADCB': 'Abu Dhabi Commercial Bank',
+    'ADCC': 'Akola District Central Co-operative Bank',
+    'AHDC': 'Ahmednagar District Central Co-operative Bank',
+    'AIRP': 'Airtel Payments Bank',
+    'AJAR': 'Ajara Urban Co-operative Bank',
+    'AJHC': 'Ambarnath Jaihind Co-operative Bank',
+    'AKJB': 'Akola Janata Commercial Co-operative Bank',
+    'ALLA': 'Allahabad Bank',
+    'AMCB': 'Ahmedabad Mercantile Co-operative Bank',
+    'AMDN': 'Ahmednagar Merchants Co-operative Bank',
+    'ANDB': 'Andhra Bank',
+    'ANZB': 'Australia and New Zealand Banking Group',
+    'APBL': 'Andhra Pradesh State Co-operative Bank',
+    'APGB': 'Andhra Pragathi Grameena Bank',
+    'APGV': 'Andhra Pradesh Grameena Vikas Bank',
+    'APMC': 'A.P. Mahesh Co-operative Urban Bank',
+    'ARBL': 'Arvind Sahakari Bank',
+    'ASBL': 'Apna Sahakari Bank',
+    'AUBL': 'AU Small Finance Bank',
+    'AUCB': 'Almora Urban Co-operative Bank',
+    'BACB': 'Bassein Catholic Co-operative Bank',
+    'BARA': 'Baramati Sahakari Bank',
+    'BARB': 'Bank of Baroda',
+    'BARC': 'Barclays Bank',
+    'BBKM': 'Bank of Bahrain and Kuwait',
+    'BCBM': 'Bharat Co-operative Bank Mumbai',
+    'BCEY': 'Bank of Ceylon',
+    'BCHN': 'Bank of China',
+    'BDBL': 'Bandhan Bank',
+    'BKDN': 'Dena Bank',
+    'BKID': 'Bank of India',
+    'BMCB': 'Bombay Mercantile Co-operative Bank',
+    'BNPA': 'BNP Paribas Bank',
+    'BNSB': 'Bhagini Nivedita Sahakari Bank',
+    'BOFA': 'Bank of America',
+    'BOTM': 'MUFG Bank',
+    'BUCB': 'Burdwan Central Co-operative Bank',
+    'CBIN': 'Central Bank of India',
+    'CCBL': 'Citizen Credit Co-operative Bank',
+    'CCIL': 'Clearing Corporation of India',
+    'CHAS': 'JPMorgan Chase Bank',
+    'CITI': 'Citibank',
+    'CIUB': 'City Union Bank',
+    'CLBL': 'Capital Small Finance Bank',
+    'CNRB': 'Canara Bank',
+    'COAS': 'Coastal Local Area Bank',
+    'CORP': 'Corporation Bank',
+    'COSB': 'Cosmos Co-operative Bank',
+    'CRES': 'Credit Suisse',
+    'CRGB': 'Chhattisgarh Rajya Gramin Bank',
+    'CRUB': 'Shri Chhatrapati Rajashri Shahu Urban Co-operative Bank',
+    'CSBK': 'CSB Bank',
+    'CSBX': 'Chartered Sahakari Bank Niyamitha',
+    'CTBA': 'Commonwealth Bank of Australia',
+    'CTCB': 'CTBC Bank',
+    'DBSS': 'DBS Bank',
+    'DCBL': 'DCB Bank',
+    'DCUB': 'Darussalam Co-operative Urban Bank',
+    'DEOB': 'Deogiri Nagari Sahakari Bank',
+    'DEUT': 'Deutsche Bank',
+    'DICG': 'Deposit Insurance and Credit Guarantee Corporation',
+    'DLSC': 'Delhi State Co-operative Bank',
+    'DLXB': 'Dhanlaxmi Bank',
+    'DMKJ': 'DMK Jaoli Bank',
+    'DNSB': 'Dombivli Nagari Sahakari Bank',
+    'DOHB': 'Doha Bank',
+    'EBIL': 'Emirates NBD Bank',
+    'EIBI': 'Export Import Bank of India',
+    'ESFB': 'Equitas Small Finance Bank',
+    'ESMF': 'ESAF Small Finance Bank',
+    'FDRL': 'Federal Bank',
+    'FINO': 'Fino Payments Bank',
+    'FIRN': 'FirstRand Bank',
+    'FSFB': 'Fincare Small Finance Bank',
+    'GABK': 'Gayatri Co-operative Urban Bank',
+    'GBCB': 'Greater Bombay Co-operative Bank',
+    'GDCB': 'Gadchiroli District Central Co-operative Bank',
+    'GGBK': 'Gurgaon Gramin Bank',
+    'GSCB': 'Gujarat State Co-operative Bank',
+    'GSSB': 'Guardian Souharda Sahakari Bank Niyamita',
+    'HARC': 'Haryana State Co-operative Bank',
+    'HCBL': 'Hasti Co-operative Bank',
+    'HDFC': 'HDFC Bank',
+    'HPSC': 'Himachal Pradesh State Co-operative Bank',
+    'HSBC': 'HSBC Bank',
+    'HUSB': 'Hutatma Sahakari Bank',
+    'IBBK': 'Maybank Indonesia',
+    'IBKL': 'IDBI Bank',
+    'IBKO': 'Industrial Bank of Korea',
+    'ICBK': 'Industrial and Commercial Bank of China',
+    'ICIC': 'ICICI Bank',
+    'ICLL': 'Indian Clearing Corporation',
+    'IDFB': 'IDFC FIRST Bank',
+    'IDIB': 'Indian Bank',
+    'IDUK': 'Idukki District Co-operative Bank',
+    'INDB': 'IndusInd Bank',
+    'IOBA': 'Indian Overseas Bank',
+    'IPOS': 'India Post Payments Bank',
+    'ITBL': 'Irinjalakuda Town Co-operative Bank',
+    'JAKA': 'Jammu & Kashmir Bank',
+    'JANA': 'Janaseva Sahakari Bank',
+    'JASB': 'Janaseva Sahakari Bank (Borivli)',
+    'JIOP': 'Jio Payments Bank',
+    'JJSB': 'Jalgaon Janata Sahakari Bank',
+    'JPCB': 'Jalgaon Peoples Co-operative Bank',
+    'JSBL': 'Janakalyan Sahakari Bank',
+    'JSBP': 'Janata Sahakari Bank',
+    'JSFB': 'Jana Small Finance Bank',
+    'JTSC': 'Janatha Seva Co-operative Bank',
+    'KACE': 'Kangra Central Co-operative Bank',
+    'KAIJ': 'Kallappanna Awade Ichalkaranji Janata Sahakari Bank',
+    'KANG': 'Kangra Co-operative Bank',
+    'KARB': 'Karnataka Bank',
+    'KBKB': 'Kookmin Bank',
+    'KCBL': 'Kapol Co-operative Bank',
+    'KCCB': 'Kalupur Commercial Co-operative Bank',
+    'KDCB': 'Kozhikode District Co-operative Bank',
+    'KGRB': 'Kaveri Grameena Bank',
+    'KJSB': 'Kalyan Janata Sahakari Bank',
+    'KKBK': 'Kotak Mahindra Bank',
+    'KLGB': 'Kerala Gramin Bank',
+    'KNSB': 'Kurmanchal Nagar Sahakari Bank',
+    'KOEX': 'KEB Hana Bank',
+    'KOLH': 'Kolhapur Urban Co-operative Bank',
+    'KRTH': 'Krungthai Bank',
+    'KSBK': 'Kerala State Co-operative Bank',
+    'KSCB': 'Karnataka State Co-operative Apex Bank',
+    'KUCB': 'Karad Urban Co-operative Bank',
+    'KVBL': 'Karur Vysya Bank',
+    'KVGB': 'Karnataka Vikas Grameena Bank',
+    'LAVB': 'Laxmi Vilas Bank',
+    'MAHB': 'Bank of Maharashtra',
+    'MAHG': 'Maharashtra Gramin Bank',
+    'MCAB': 'Meghalaya Co-operative Apex Bank',
+    'MCBL': 'Mahanagar Co-operative Bank',
+    'MDBK': 'Model Co-operative Bank',
+    'MDCB': 'Mumbai District Central Co-operative Bank',
+    'MHCB': 'Mizuho Bank',
+    'MKPB': 'Malkapur Urban Co-operative Bank',
+    'MSBL': 'Mahesh Sahakari Bank',
+    'MSCI': 'Maharashtra State Co-operative Bank',
+    'MSHQ': 'Mashreq Bank',
+    'MSLM': 'Muslim Co-operative Bank',
+    'MSNU': 'Mehsana Urban Co-operative Bank',
+    'MUBL': 'Municipal Co-operative Bank',
+    'MVCB': 'Sir M Visvesvaraya Co-operative Bank',
+    'NATA': 'National Australia Bank',
+    'NBAD': 'First Abu Dhabi Bank',
+    'NBRD': 'National Bank for Agriculture and Rural Development',
+    'NCUB': 'Nilambur Co-operative Urban Bank',
+    'NESF': 'North East Small Finance Bank',
+    'NGSB': 'Nagpur Nagarik Sahakari Bank',
+    'NHBA': 'Nonghyup Bank',
+    'NICB': 'New India Co-operative Bank',
+    'NJBK': 'Nav Jeevan Co-operative Bank',
+    'NKGS': 'NKGSB Co-operative Bank',
+    'NMCB': 'Nasik Merchants Co-operative Bank',
+    'NMGB': 'North Malabar Gramin Bank',
+    'NNSB': 'Nutan Nagarik Sahakari Bank',
+    'NOSC': 'Bank of Nova Scotia',
+    'NSPB': 'NSDL Payments Bank',
+    'NTBL': 'Nainital Bank',
+    'NUCB': 'Nagar Urban Co-operative Bank',
+    'NVNM': 'Navnirman Co-operative Bank',
+    'OIBA': 'HSBC Bank Oman',
+    'ORBC': 'Oriental Bank of Commerce',
+    'PHNP': 'PhonePe',
+    'PJSB': 'G P Parsik Bank',
+    'PKGB': 'Karnataka Grameena Bank',
+    'PMCB': 'Punjab & Maharashtra Co-operative Bank',
+    'PMEC': 'Prime Co-operative Bank',
+    'PPNT': 'Pay Point India Network',
+    'PRTH': 'Prathama Bank',
+    'PSBL': 'Pavana Sahakari Bank',
+    'PSIB': 'Punjab & Sind Bank',
+    'PUNB': 'Punjab National Bank',
+    'PUSD': 'Pusad Urban Co-operative Bank',
+    'PYTM': 'Paytm Payments Bank',
+    'QNBA': 'Qatar National Bank',
+    'RABO': 'Rabobank International',
+    'RATN': 'RBL Bank',
+    'RBIH': 'IDRBT',
+    'RBIN': 'Reserve Bank of India',
+    'RBIP': 'Reserve Bank of India',
+    'RBIS': 'Reserve Bank of India',
+    'RDCB': 'Rajnandgaon District Central Co-operative Bank',
+    'RMGB': 'Rajasthan Marudhara Gramin Bank',
+    'RNSB': 'Rajkot Nagrik Sahakari Bank',
+    'RRBP': 'Rajarambapu Sahakari Bank',
+    'RSBL': 'Rajgurunagar Sahakari Bank',
+    'RSCB': 'Rajasthan State Co-operative Bank',
+    'RSSB': 'Rajarshi Shahu Sahakari Bank',
+    'SABR': 'Sberbank',
+    'SAGB': 'Saptagiri Grameena Bank',
+    'SAHE': 'Sahebrao Deshmukh Co-operative Bank',
+    'SANT': 'Sant Sopankaka Sahakari Bank',
+    'SBIN': 'State Bank of India',
+    'SBLS': 'Samarth Sahakari Bank',
+    'SCBL': 'Standard Chartered Bank',
+    'SDCB': 'Surat District Co-operative Bank',
+    'SDCE': 'Satara District Central Co-operative Bank',
+    'SECB': 'Sree Charan Souhardha Co-operative Bank',
+    'SGBA': 'Saurashtra Gramin Bank',
+    'SHBK': 'Shinhan Bank',
+    'SIBL': 'South Indian Bank',
+    'SIDB': 'Small Industries Development Bank of India',
+    'SIDC': 'Sindhudurg District Central Co-operative Bank',
+    'SJSB': 'Solapur Janata Sahakari Bank',
+    'SKNB': 'Shree Kadi Nagarik Sahakari Bank',
+    'SMBC': 'Sumitomo Mitsui Banking Corporation',
+    'SMCB': 'Shivalik Small Finance Bank',
+    'SMNB': 'Smriti Nagrik Sahakari Bank Maryadit',
+    'SNBK': 'Saraspur Nagrik Co-operative Bank',
+    'SOGE': 'Societe Generale',
+    'SPCB': 'Surath Peoples Co-operative Bank',
+    'SRCB': 'Saraswat Co-operative Bank',
+    'STCB': 'SBM Bank India',
+    'SURY': 'Suryoday Small Finance Bank',
+    'SUSB': 'Suco Souharda Sahakari Bank',
+    'SUTB': 'Sutex Co-operative Bank',
+    'SVBL': 'Seva Vikas Co-operative Bank',
+    'SVCB': 'Shamrao Vithal Co-operative Bank',
+    'SVSH': 'Shri Veershaiv Co-operative Bank',
+    'SYNB': 'Syndicate Bank',
+    'TAUB': 'Akola Urban Co-operative Bank',
+    'TBMC': 'Banaskantha Mercantile Co-operative Bank',
+    'TBSB': 'Thane Bharat Sahakari Bank',
+    'TCBR': 'Co-operative Bank of Rajkot',
+    'TDCB': 'Thane District Central Co-operative Bank',
+    'TGMB': 'Tumkur Grain Merchants Co-operative Bank',
+    'TGRB': 'Telangana Grameena Bank',
+    'THRS': 'Thrissur District Co-operative Bank',
+    'TJSB': 'TJSB Sahakari Bank',
+    'TMBL': 'Tamilnad Mercantile Bank',
+    'TMSB': 'Malad Sahakari Bank',
+    'TNCB': 'Nawanagar Co-operative Bank',
+    'TNSC': 'Tamil Nadu State Apex Co-operative Bank',
+    'TPSC': 'Punjab State Co-operative Bank',
+    'TSAB': 'Telangana State Co-operative Apex Bank',
+    'TSSB': 'Satara Sahakari Bank',
+    'TTCB': 'Textile Traders Co-operative Bank',
+    'UBIN': 'Union Bank of India',
+    'UCBA': 'UCO Bank',
+    'UCLB': 'Urban Co-operative Bank Bareilly',
+    'UJVN': 'Ujjivan Small Finance Bank',
+    'UNBA': 'Unity Small Finance Bank',
+    'UOVB': 'United Overseas Bank',
+    'UPCB': 'Uttar Pradesh Co-operative Bank',
+    'URBN': 'Urban Co-operative Bank Perinthalmanna',
+    'USCB': 'Uttarakhand State Co-operative Bank',
+    'UTBI': 'United Bank of India',
+    'UTIB': 'Axis Bank',
+    'UTKS': 'Utkarsh Small Finance Bank',
+    'UUCB': 'Udaipur Urban Co-operative Bank',
+    'VARA': 'Varachha Co-operative Bank',
+    'VASJ': 'Vasai Janata Sahakari Bank',
+    'VCOB': 'Vijay Co-operative Bank',
+    'VIJB': 'Vijaya Bank',
+    'VSBA': 'Vikas Souharda Co-operative Bank',
+    'VSBL': 'Vishweshwar Sahakari Bank',
+    'VTBJ': 'VTB Bank',
+    'VVSB': 'Vasai Vikas Sahakari Bank',
+    'WBSC': 'West Bengal State Co-operative Bank',
+    'WPAC': 'Westpac Banking Corporation',
+    'XNSE': 'NSE Clearing',
+    'YESB': 'Yes Bank',
+    'ZCBL': 'Zoroastrian Co-operative Bank',
+    'ZSBL': 'Zila Sahakari Bank Ghaziabad',
+}
+
+# Codes of regulators, clearing houses and payment apps. They are valid IFSC
+# prefixes, but their names turn up in statement footers and UPI narrations,
+# so a match on them only masks the bank names nested inside it
+IFSC_ONLY_CODES = {'CCIL', 'DICG', 'ICLL', 'PHNP', 'PPNT', 'RBIH', 'RBIN', 'RBIP', 'RBIS', 'XNSE'}
+
+# Extra spellings seen on statements, abbreviations and common OCR misreads
+# (l/1/I and 0/O confusion), keyed by IFSC bank code
+BANK_ALIASES = {
+    'SBIN': ['SBI', 'State Bank of lndia', 'State Bank 0f India', 'Slate Bank of India'],
+    'HDFC': ['HDFC', 'HDEC Bank', 'H D F C Bank'],
+    'ICIC': ['ICICI', '1CICI Bank', 'lCICI Bank', 'ICIC1 Bank'],
+    'UTIB': ['Axis', 'Axls Bank', 'AXIS BANK LTD'],
+    'PUNB': ['PNB', 'Punjab Natl Bank', 'Punjab Nationa1 Bank'],
+    'BARB': ['BOB', 'Bank 0f Baroda', 'Bank of Bar0da'],
+    'KKBK': ['Kotak Bank', 'Kotak Mahindra', 'K0tak Mahindra Bank'],
+    'YESB': ['YES BANK LTD', 'Yes Bank Limited'],
+    'CNRB': ['Canara', 'Canara Bank Ltd'],
+    'UBIN': ['Union Bank', 'Union Bank of lndia'],
+    'BKID': ['Bank of lndia', 'BOI'],
+    'MAHB': ['Maharashtra Bank'],
+    'CBIN': ['Central Bank of lndia', 'CBI'],
+    'IOBA': ['IOB', 'lndian Overseas Bank'],
+    'IDIB': ['lndian Bank'],
+    'PSIB': ['Punjab and Sind Bank', 'Punjab & Sindh Bank'],
+    'UCBA': ['UCO'],
+    'INDB': ['Indusind', 'lndusInd Bank'],
+    'IDFB': ['IDFC First', 'IDFC Bank'],
+    'FDRL': ['The Federal Bank'],
+    'KVBL': ['KVB'],
+    'TMBL': ['TMB'],
+    'CIUB': ['CUB'],
+    'RATN': ['RBL', 'Ratnakar Bank'],
+    'IBKL': ['IDBI'],
+    'JAKA': ['J&K Bank', 'Jammu and Kashmir Bank'],
+    'AUBL': ['AU Bank', 'AU Small Finance'],
+    'AIRP': ['Airtel Payments'],
+    'PYTM': ['Paytm Bank'],
+    'IPOS': ['IPPB'],
+    'SCBL': ['Standard Chartered'],
+    'CITI': ['Citi Bank'],
+}
+
+def _spelling_variants(name):
+    """
+    Expand the ways statements spell 'Co-operative' in a bank name
+
+    Args:
+        name (str): Canonical bank name
+
+    Returns:
+        list: The name and its variants
+    """
+    if 'Co-operative' not in name:
+        return [name]
+    return [name.replace('Co-operative', spelling)
+            for spelling in ('Co-operative', 'Cooperative', 'Co operative', 'Co-op', 'Coop')]
+
+def _normalize(text):
+    """
+    Lowercase text and collapse whitespace runs, in a single pass
+
+    Args:
+        text (str): Raw text
+
+    Returns:
+        str: Normalized text
+    """
+    chars = []
+    in_space = False
+    for c in text:
+        if c.isspace():
+            if not in_space:
+                chars.append(' ')
+            in_space = True
+        else:
+            chars.append(c.lower())
+            in_space = False
+    return ''.join(chars)
+
+class BankNameMatcher:
+    """
+    Aho-Corasick automaton over bank names and aliases, so a statement is
+    scanned once no matter how many banks are supported
+    """
+
+    def __init__(self, names_by_code):
+        """
+        Args:
+            names_by_code (dict): IFSC bank code -> list of names to match
+        """
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for code, names in names_by_code.items():
+            for name in names:
+                self._add(_normalize(name), code)
+        self._build()
+
+    def _add(self, pattern, code):
+        state = 0
+        for c in pattern:
+            if c not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+                self.goto[state][c] = len(self.goto) - 1
+            state = self.goto[state][c]
+        self.output[state].append((code, len(pattern)))
+
+    def _build(self):
+        # Breadth-first so each fail link points at an already finished state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for c, child in self.goto[state].items():
+                queue.append(child)
+                fallback = self.fail[state]
+                while fallback and c not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(c, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text):
+        """
+        Find every bank mentioned in the text
+
+        Args:
+            text (str): OCR text
+
+        Returns:
+            list: (start, length, IFSC bank code) for each match, in order of
+            position, leaving out matches nested inside a longer one
+        """
+        text = _normalize(text)
+        found = []
+        state = 0
+        for i, c in enumerate(text):
+            while state and c not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(c, 0)
+            for code, length in self.output[state]:
+                # Only accept whole-word matches so 'BOB' doesn't match 'Bobby'
+                start = i - length + 1
+                if start > 0 and text[start - 1].isalnum():
+                    continue
+                if i + 1 < len(text) and text[i + 1].isalnum():
+                    continue
+                found.append((start, length, code))
+
+        # Drop matches nested inside a longer one, such as 'Bank of India'
+        # inside 'State Bank of India'
+        found.sort(key=lambda match: (match[0], -match[1]))
+        matches = []
+        end = -1
+        for start, length, code in found:
+            if start + length > end:
+                matches.append((start, length, code))
+                end = start + length
+        return matches
+
+_matcher = BankNameMatcher({
+    code: _spelling_variants(name) + BANK_ALIASES.get(code, []) for code, name in IFSC_BANK_CODES.items()
+})
+
+def identify_bank(text, ifsc_code=''):
+    """
+    Identify the bank a statement belongs to
+
+    Args:
+        text (str): OCR text of the statement
+        ifsc_code (str): IFSC code extracted from the statement, if any
+
+    Returns:
+        tuple: Canonical bank name ('' if no bank was recognized), and
+        whether the bank named first in the text disagrees with the IFSC
+    """
+    # The bank is normally named in the header, so the earliest mention wins
+    named_bank = ''
+    for start, length, code in _matcher.find(text):
+        if code not in IFSC_ONLY_CODES:
+            named_bank = IFSC_BANK_CODES[code]
+            break
+
+    # The statement's own IFSC is the strongest signal, other banks are often
+    # named in transaction lines
+    ifsc_bank = IFSC_BANK_CODES.get(ifsc_code[:4].upper(), '')
+    if ifsc_bank:
+        return ifsc_bank, bool(named_bank) and named_bank != ifsc_bank
+    return named_bank, False
@@ -1,6 +1,7 @@
 # processing/ocr_extraction.py
 import pytesseract
 import cv2
+import psutil
 import re
 import os
 import sys
@@ -8,11 +9,103 @@ import json
 from PIL import Image
 import numpy as np
 import tempfile
+import time
+import traceback
 import logging
+from bank_matcher import identify_bank
+from pincode_index import canonical_state, lookup_pincode, validate_address
 logging.basicConfig(filename='ocr_error.log', level=logging.DEBUG)
 
 pytesseract.pytesseract.tesseract_cmd = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
 
+# Total time (seconds) a single document may spend across all OCR stages
+DOCUMENT_TIME_BUDGET = float(os.environ.get('OCR_TIME_BUDGET', '30'))
+
+# Optional stages (e.g. the enhanced-image retry) are skipped when less than
+# this many seconds of the budget remain
+OPTIONAL_STAGE_RESERVE = float(os.environ.get('OCR_OPTIONAL_STAGE_RESERVE', '8'))
+
+# Resident memory (MB) above which this worker skips optional stages, 0 disables it
+MAX_WORKER_RSS_MB = int(os.environ.get('OCR_MAX_RSS_MB', '0'))
+
+_deadline = None
+
+class DocumentTimeout(Exception):
+    """Raised when the per-document time budget has been used up"""
+    pass
+
+def start_time_budget(seconds=DOCUMENT_TIME_BUDGET):
+    """
+    Start the time budget for the document being processed
+    
+    Args:
+        seconds (float): Budget in seconds, 0 or less disables it
+    """
+    global _deadline
+    _deadline = time.monotonic() + seconds if seconds > 0 else None
+
+def remaining_budget():
+    """
+    Get the time left in the current document budget
+    
+    Returns:
+        float: Seconds remaining, or None if no budget is active
+    """
+    if _deadline is None:
+        return None
+    return max(0.0, _deadline - time.monotonic())
+
+def has_budget_for_optional_stage():
+    """
+    Check whether enough budget remains to run an optional stage
+    
+    Returns:
+        bool: True if the stage should run
+    """
+    remaining = remaining_budget()
+    return remaining is None or remaining > OPTIONAL_STAGE_RESERVE
+
+def ocr_image(image):
+    """
+    Run Tesseract on an image, bounded by the remaining document budget
+    
+    Args:
+        image (numpy.ndarray): Image to read
+    
+    Returns:
+        str: Recognized text
+    """
+    remaining = remaining_budget()
+    if remaining is not None and remaining <= 0:
+        raise DocumentTimeout("Time budget exhausted before OCR")
+    
+    try:
+        # pytesseract treats a timeout of 0 as unbounded
+        return pytesseract.image_to_string(image, lang='eng', timeout=remaining or 0)
+    except RuntimeError as e:
+        if 'timeout' in str(e).lower():
+            raise DocumentTimeout("Tesseract call exceeded the remaining time budget")
+        raise
+
+def over_memory_limit(max_mb=MAX_WORKER_RSS_MB):
+    """
+    Check the worker's resident memory between stages, so a runaway document
+    stops growing instead of swapping the host
+    
+    Args:
+        max_mb (int): Limit in megabytes, 0 disables the check
+    
+    Returns:
+        bool: True if the worker's RSS is above the limit
+    """
+    if max_mb <= 0:
+        return False
+    rss_mb = psutil.Process().memory_info().rss / (1024 * 1024)
+    if rss_mb > max_mb:
+        logging.warning(f"Worker RSS {rss_mb:.0f} MB exceeds {max_mb} MB, skipping optional stages")
+        return True
+    return False
+
 def preprocess_image(image_path):
     """
     Preprocess an image for better OCR results
@@ -52,7 +145,7 @@ def extract_aadhaar_info(image_path):
     preprocessed = preprocess_image(image_path)
     
     # Extract text using pytesseract
-    text = pytesseract.image_to_string(preprocessed, lang='eng')
+    text = ocr_image(preprocessed)
     
     # Initialize the result dictionary
     result = {
@@ -188,7 +281,7 @@ def extract_pan_info(image_path):
     preprocessed = preprocess_image(image_path)
     
     # Extract text using pytesseract
-    text = pytesseract.image_to_string(preprocessed, lang='eng')
+    text = ocr_image(preprocessed)
     
     # Initialize the result dictionary
     result = {
@@ -247,7 +340,7 @@ def extract_income_info(document_path):
     preprocessed = preprocess_image(document_path)
     
     # Extract text using pytesseract
-    text = pytesseract.image_to_string(preprocessed, lang='eng')
+    text = ocr_image(preprocessed)
     
     # Initialize the result dictionary
     result = {
@@ -319,7 +412,7 @@ def extract_address_data(image_path):
     preprocessed = preprocess_image(image_path)
     
     # Extract text using pytesseract
-    text = pytesseract.image_to_string(preprocessed, lang='eng')
+    text = ocr_image(preprocessed)
     
     # Initialize result dictionary
     result = {
@@ -328,7 +421,9 @@ def extract_address_data(image_path):
         'address': '',
         'pincode': '',
         'city': '',
-        'state': ''
+        'district': '',
+        'state': '',
+        'address_verified': None
     }
     
     # Extract name
@@ -351,10 +446,21 @@ def extract_address_data(image_path):
     if city_match:
         result['city'] = city_match.group(1).strip()
     
-    # Extract state
+    # Extract state, in its standard spelling when it's recognized
     state_match = re.search(r'(?:State|राज्य)[\s:]+([\w\s]+)', text, re.IGNORECASE)
     if state_match:
-        result['state'] = state_match.group(1).strip()
+        result['state'] = canonical_state(state_match.group(1)) or state_match.group(1).strip()
+    
+    # Fill district/state from the pincode index and check the address
+    # against it, so the document doesn't need another OCR pass
+    if result['pincode']:
+        place = lookup_pincode(result['pincode'])
+        if place:
+            result['district'] = place['district']
+            # An unrecognized state is usually OCR noise, the pincode's is better
+            if not canonical_state(result['state']):
+                result['state'] = place['state'] or result['state']
+        result['address_verified'] = validate_address(result['address'], result['pincode'], result['state'])
     
     return result
 
@@ -372,7 +478,7 @@ def extract_bank_data(image_path):
     preprocessed = preprocess_image(image_path)
     
     # Extract text using pytesseract
-    text = pytesseract.image_to_string(preprocessed, lang='eng')
+    text = ocr_image(preprocessed)
     
     # Initialize result dictionary
     result = {
@@ -382,17 +488,19 @@ def extract_bank_data(image_path):
         'account_holder': '',
         'ifsc_code': '',
         'account_balance': '',
-        'statement_period': ''
+        'statement_period': '',
+        'bank_mismatch': False
     }
     
-    # Extract bank name
-    bank_names = ["State Bank of India", "HDFC Bank", "ICICI Bank", "Axis Bank", "Punjab National Bank", 
-                  "Bank of Baroda", "Kotak Mahindra Bank", "Yes Bank", "Canara Bank", "Union Bank of India"]
+    # Extract IFSC code
+    ifsc_match = re.search(r'(?:IFSC|IFSC Code|आईएफएससी कोड)[\s:]*([A-Z0-9]{11})', text, re.IGNORECASE)
+    if ifsc_match:
+        result['ifsc_code'] = ifsc_match.group(1).strip()
     
-    for bank in bank_names:
-        if bank.lower() in text.lower():
-            result['bank_name'] = bank
-            break
+    # Extract bank name, cross-checked against the IFSC bank code
+    result['bank_name'], result['bank_mismatch'] = identify_bank(text, result['ifsc_code'])
+    if result['bank_mismatch']:
+        logging.warning(f"IFSC {result['ifsc_code']} belongs to {result['bank_name']} but the statement names another bank first")
     
     if not result['bank_name']:
         bank_match = re.search(r'(?:Bank Name|बैंक|Bank)[\s:]*([A-Za-z\s]+)', text, re.IGNORECASE)
@@ -409,11 +517,6 @@ def extract_bank_data(image_path):
     if holder_match:
         result['account_holder'] = holder_match.group(1).strip()
     
-    # Extract IFSC code
-    ifsc_match = re.search(r'(?:IFSC|IFSC Code|आईएफएससी कोड)[\s:]*([A-Z0-9]{11})', text, re.IGNORECASE)
-    if ifsc_match:
-        result['ifsc_code'] = ifsc_match.group(1).strip()
-    
     # Extract account balance
     balance_match = re.search(r'(?:Balance|Closing Balance|Available Balance|बैलेंस)[\s:]*(?:Rs\.|₹|INR)?[\s]*(\d+(?:,\d+)*(?:\.\d+)?)', text, re.IGNORECASE)
     if balance_match:
@@ -440,7 +543,7 @@ def extract_document_info(document_path, doc_type):
     if doc_type == 'id':
         # Try to determine if it's an Aadhaar or PAN card
         preprocessed = preprocess_image(document_path)
-        text = pytesseract.image_to_string(preprocessed, lang='eng')
+        text = ocr_image(preprocessed)
         
         # Check for Aadhaar keywords
         if re.search(r'(?:Aadhaar|आधार|UIDAI|UID|Unique Identification)', text, re.IGNORECASE):
@@ -451,12 +554,25 @@ def extract_document_info(document_path, doc_type):
         else:
             # If can't determine, try both and return the one with more information
             aadhaar_info = extract_aadhaar_info(document_path)
-            pan_info = extract_pan_info(document_path)
             
-            # If either has an ID number, use that one
+            # An Aadhaar number settles it, the PAN pass can't change the result
             if aadhaar_info.get('id_number'):
                 return aadhaar_info
-            elif pan_info.get('id_number'):
+            
+            # Skip the second pass if the budget or memory limit can't cover it
+            if over_memory_limit():
+                aadhaar_info['memory_limited'] = True
+                return aadhaar_info
+            if not has_budget_for_optional_stage():
+                aadhaar_info['timed_out'] = True
+                return aadhaar_info
+            try:
+                pan_info = extract_pan_info(document_path)
+            except DocumentTimeout:
+                aadhaar_info['timed_out'] = True
+                return aadhaar_info
+            
+            if pan_info.get('id_number'):
                 return pan_info
             
             # Count non-empty fields
@@ -521,9 +637,18 @@ if __name__ == "__main__":
         print(json.dumps({"error": f"File not found: {document_path}"}))
         sys.exit(1)
     
+    # Each job runs in a fresh process, so the worker is recycled after every
+    # document; the RSS check only guards against a single runaway job
+    start_time_budget()
+    
     try:
         # Try with original image
-        result = extract_document_info(document_path, doc_type)
+        try:
+            result = extract_document_info(document_path, doc_type)
+        except DocumentTimeout as e:
+            logging.warning(f"Time budget exceeded for {document_path}: {str(e)}")
+            print(json.dumps({"error": "Document processing timed out", "timed_out": True}))
+            sys.exit(0)
         
         # If not enough information, try with enhanced image
         has_useful_info = False
@@ -536,13 +661,24 @@ if __name__ == "__main__":
         elif doc_type == 'bank':
             has_useful_info = result.get('account_number') or result.get('bank_name')
             
-        if not has_useful_info:
+        # The enhanced retry is optional, skip it if the budget is nearly
+        # spent or the worker is already over its memory limit
+        if not has_useful_info and over_memory_limit():
+            result['memory_limited'] = True
+        elif not has_useful_info and not has_budget_for_optional_stage():
+            result['timed_out'] = True
+        elif not has_useful_info:
             enhanced_path = enhance_image_for_ocr(document_path)
-            enhanced_result = extract_document_info(enhanced_path, doc_type)
-            
-            # Clean up enhanced image
-            if os.path.exists(enhanced_path):
-                os.remove(enhanced_path)
+            try:
+                enhanced_result = extract_document_info(enhanced_path, doc_type)
+            except DocumentTimeout:
+                # Keep the partial result from the first pass
+                enhanced_result = {}
+                result['timed_out'] = True
+            finally:
+                # Clean up enhanced image
+                if os.path.exists(enhanced_path):
+                    os.remove(enhanced_path)
                 
             # Use enhanced result if it has more information
             if doc_type == 'id':
@@ -0,0 +1,319 @@
+# processing/pincode_index.py
+import csv
+import json
+import mmap
+import os
+import re
+import sys
+from array import array
+from collections import Counter, defaultdict
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+
+# Built from the India Post 'All India Pincode Directory' (data.gov.in,
+# Government Open Data License - India) with build_index below.
+#
+# One little-endian uint16 per pincode from 100000 to 999999, holding the
+# 1-based position of its place in the places file (0 = no such pincode)
+INDEX_PATH = os.path.join(DATA_DIR, 'pincodes.idx')
+
+# JSON list of [district, state] referenced by the index
+PLACES_PATH = os.path.join(DATA_DIR, 'pincode_places.json')
+
+FIRST_PINCODE = 100000
+LAST_PINCODE = 999999
+
+STATE_NAMES = [
+    'Andaman and Nicobar Islands', 'Andhra Pradesh', 'Arunachal Pradesh', 'Assam', 'Bihar',
+    'Chandigarh', 'Chhattisgarh', 'Dadra and Nagar Haveli and Daman and Diu', 'Delhi', 'Goa',
+    'Gujarat', 'Haryana', 'Himachal Pradesh', 'Jammu and Kashmir', 'Jharkhand', 'Karnataka',
+    'Kerala', 'Ladakh', 'Lakshadweep', 'Madhya Pradesh', 'Maharashtra', 'Manipur', 'Meghalaya',
+    'Mizoram', 'Nagaland', 'Odisha', 'Puducherry', 'Punjab', 'Rajasthan', 'Sikkim',
+    'Tamil Nadu', 'Telangana', 'Tripura', 'Uttar Pradesh', 'Uttarakhand', 'West Bengal',
+]
+
+# Old names, abbreviations and common misspellings, keyed like _state_key
+STATE_ALIASES = {
+    'orissa': 'Odisha',
+    'pondicherry': 'Puducherry',
+    'pondichery': 'Puducherry',
+    'uttaranchal': 'Uttarakhand',
+    'chattisgarh': 'Chhattisgarh',
+    'chhatisgarh': 'Chhattisgarh',
+    'telengana': 'Telangana',
+    'kerela': 'Kerala',
+    'newdelhi': 'Delhi',
+    'nctofdelhi': 'Delhi',
+    'jandk': 'Jammu and Kashmir',
+    'jk': 'Jammu and Kashmir',
+    'andamanandnicobar': 'Andaman and Nicobar Islands',
+    'andamannicobarislands': 'Andaman and Nicobar Islands',
+    'dadraandnagarhaveli': 'Dadra and Nagar Haveli and Daman and Diu',
+    'damananddiu': 'Dadra and Nagar Haveli and Daman and Diu',
+    'ap': 'Andhra Pradesh',
+    'hp': 'Himachal Pradesh',
+    'mp': 'Madhya Pradesh',
+    'mh': 'Maharashtra',
+    'tn': 'Tamil Nadu',
+    'up': 'Uttar Pradesh',
+    'wb': 'West Bengal',
+}
+
+# State for each 3-digit pincode prefix (the postal sorting district), used
+# only when the index files are missing. Ranges are inclusive and later ones
+# override earlier ones; prefixes that are split between states are set to
+# None so they are never guessed.
+PREFIX_STATE_RANGES = [
+    (110, 110, 'Delhi'),
+    (120, 136, 'Haryana'),
+    (140, 160, 'Punjab'),
+    (160, 160, None),
+    (171, 177, 'Himachal Pradesh'),
+    (180, 193, 'Jammu and Kashmir'),
+    (194, 194, 'Ladakh'),
+    (201, 285, 'Uttar Pradesh'),
+    (244, 244, None),
+    (246, 247, None),
+    (248, 249, 'Uttarakhand'),
+    (262, 262, None),
+    (263, 263, 'Uttarakhand'),
+    (301, 345, 'Rajasthan'),
+    (360, 396, 'Gujarat'),
+    (396, 396, None),
+    (400, 445, 'Maharashtra'),
+    (403, 403, 'Goa'),
+    (450, 488, 'Madhya Pradesh'),
+    (490, 497, 'Chhattisgarh'),
+    (500, 509, 'Telangana'),
+    (515, 535, 'Andhra Pradesh'),
+    (560, 591, 'Karnataka'),
+    (600, 643, 'Tamil Nadu'),
+    (605, 605, None),
+    (607, 607, None),
+    (609, 609, None),
+    (670, 695, 'Kerala'),
+    (682, 682, None),
+    (700, 743, 'West Bengal'),
+    (737, 737, 'Sikkim'),
+    (744, 744, 'Andaman and Nicobar Islands'),
+    (751, 770, 'Odisha'),
+    (781, 788, 'Assam'),
+    (790, 792, 'Arunachal Pradesh'),
+    (793, 794, 'Meghalaya'),
+    (795, 795, 'Manipur'),
+    (796, 796, 'Mizoram'),
+    (797, 798, 'Nagaland'),
+    (799, 799, 'Tripura'),
+    (800, 855, 'Bihar'),
+    (813, 813, None),
+    (814, 816, 'Jharkhand'),
+    (822, 822, 'Jharkhand'),
+    (825, 835, 'Jharkhand'),
+]
+
+_state_keys = {}
+_prefix_states = None
+_index = None
+_places = None
+
+def _state_key(name):
+    """
+    Reduce a state name to lowercase letters only, so spacing and '&' vs
+    'and' don't matter
+
+    Args:
+        name (str): State name as written
+
+    Returns:
+        str: Comparison key
+    """
+    name = name.lower().replace('&', 'and')
+    name = re.sub(r'^the\s+', '', name.strip())
+    return re.sub(r'[^a-z]', '', name)
+
+def canonical_state(name):
+    """
+    Map a state name as written on a document to its standard name
+
+    Args:
+        name (str): State name, possibly misspelt or followed by OCR noise
+
+    Returns:
+        str: Standard state name, or None if it isn't recognized
+    """
+    if not _state_keys:
+        _state_keys.update({_state_key(state): state for state in STATE_NAMES})
+        _state_keys.update(STATE_ALIASES)
+
+    key = _state_key(name)
+    if key in _state_keys:
+        return _state_keys[key]
+
+    # The State label regex often runs on into the next field, so accept the
+    # longest known name the text starts with (short abbreviations excluded)
+    starts = [k for k in _state_keys if len(k) > 3 and key.startswith(k)]
+    return _state_keys[max(starts, key=len)] if starts else None
+
+def _title(name):
+    """
+    Title-case a directory name, keeping joining words in lowercase
+
+    Args:
+        name (str): Name in any case
+
+    Returns:
+        str: Title-cased name
+    """
+    words = name.strip().title().split()
+    return ' '.join(w.lower() if i and w.lower() in ('and', 'of') else w for i, w in enumerate(words))
+
+def _load_prefix_states():
+    """
+    Expand the prefix ranges into a flat 1000-entry table
+
+    Returns:
+        list: State name (or None) for each 3-digit prefix
+    """
+    global _prefix_states
+    if _prefix_states is None:
+        table = [None] * 1000
+        for start, end, state in PREFIX_STATE_RANGES:
+            for prefix in range(start, end + 1):
+                table[prefix] = state
+        _prefix_states = table
+    return _prefix_states
+
+def _load_index():
+    """
+    Memory-map the pincode index on first use. The mapping is read-only, so
+    worker processes share the same pages through the OS page cache.
+
+    Returns:
+        bool: True if the index is available
+    """
+    global _index, _places
+    if _index is None:
+        if not (os.path.exists(INDEX_PATH) and os.path.exists(PLACES_PATH)):
+            _index = False
+            return False
+        with open(INDEX_PATH, 'rb') as f:
+            _index = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(PLACES_PATH, encoding='utf-8') as f:
+            _places = json.load(f)
+    return _index is not False
+
+def lookup_pincode(pincode):
+    """
+    Look up the district and state for a pincode
+
+    Args:
+        pincode (str): 6-digit Indian pincode
+
+    Returns:
+        dict: 'district' and 'state' (empty when unknown), or None if the
+        pincode is malformed or not in the directory
+    """
+    if not (len(pincode) == 6 and pincode.isdigit()):
+        return None
+    number = int(pincode)
+    if number < FIRST_PINCODE:
+        return None
+
+    if _load_index():
+        offset = (number - FIRST_PINCODE) * 2
+        place_id = _index[offset] | (_index[offset + 1] << 8)
+        if not place_id:
+            return None
+        district, state = _places[place_id - 1]
+        return {'district': district, 'state': state}
+
+    state = _load_prefix_states()[number // 1000]
+    return {'district': '', 'state': state or ''}
+
+def validate_address(address, pincode, state=''):
+    """
+    Check an extracted address against what the pincode says it should be
+
+    Args:
+        address (str): Extracted address text
+        pincode (str): Extracted pincode
+        state (str): Extracted state, if any
+
+    Returns:
+        bool: True if the address names the pincode's district or state,
+        False if the pincode doesn't exist or belongs to a different state
+        than the extracted one, None if there isn't enough data to tell
+    """
+    place = lookup_pincode(pincode)
+    if place is None:
+        return False
+    if not place['state']:
+        return None
+
+    # Only a recognized state can contradict the pincode; an unrecognized
+    # spelling or OCR typo tells us nothing
+    extracted_state = canonical_state(state) if state else None
+    if extracted_state and extracted_state != place['state']:
+        return False
+
+    address = address.lower()
+    for name in (place['district'], place['state']):
+        if name and name.lower() in address:
+            return True
+    return None
+
+def build_index(csv_path, out_dir=DATA_DIR):
+    """
+    Build the index files from the India Post pincode directory CSV
+    (data.gov.in 'All India Pincode Directory', one row per post office)
+
+    Args:
+        csv_path (str): Path to the directory CSV
+        out_dir (str): Directory to write the index files to
+
+    Returns:
+        int: Number of pincodes indexed
+    """
+    votes = defaultdict(Counter)
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            row = {k.strip().lower(): (v or '').strip() for k, v in row.items()}
+            pincode = row.get('pincode', '')
+            if not (len(pincode) == 6 and pincode.isdigit()):
+                continue
+            district = row.get('district') or row.get('districtname', '')
+            state = canonical_state(row.get('statename') or row.get('state', ''))
+            if district and state:
+                votes[int(pincode)][(_title(district), state)] += 1
+
+    places = []
+    place_ids = {}
+    index = array('H', [0]) * (LAST_PINCODE - FIRST_PINCODE + 1)
+    for number, counter in votes.items():
+        if not FIRST_PINCODE <= number <= LAST_PINCODE:
+            continue
+        # A pincode can span post offices in more than one district
+        place = counter.most_common(1)[0][0]
+        if place not in place_ids:
+            places.append(list(place))
+            place_ids[place] = len(places)
+        index[number - FIRST_PINCODE] = place_ids[place]
+
+    if sys.byteorder != 'little':
+        index.byteswap()
+
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, os.path.basename(INDEX_PATH)), 'wb') as f:
+        index.tofile(f)
+    with open(os.path.join(out_dir, os.path.basename(PLACES_PATH)), 'w', encoding='utf-8') as f:
+        json.dump(places, f, separators=(',', ':'))
+
+    return len(votes)
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print("Usage: python pincode_index.py <pincode_directory.csv>")
+        sys.exit(1)
+
+    count = build_index(sys.argv[1])
+    print(f"Indexed {count} pincodes into {DATA_DIR}")
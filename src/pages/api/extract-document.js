@@ -1,5 +1,5 @@
 // pages/api/extract-document.js
-import { exec } from 'child_process';
+import { spawn } from 'child_process';
 import fs from 'fs';
 import path from 'path';
 import * as formidable from 'formidable';
@@ -12,6 +12,85 @@ export const config = {
   },
 };
 
+// Per-document OCR time budget (seconds), enforced inside the Python script
+const OCR_TIME_BUDGET = Number(process.env.OCR_TIME_BUDGET || 30);
+
+// Hard limit for the Python process, with some headroom for startup and
+// image loading on top of the OCR budget
+const OCR_PROCESS_TIMEOUT_MS = (OCR_TIME_BUDGET + 15) * 1000;
+
+// Largest stdout we accept from the Python script
+const OCR_MAX_OUTPUT_BYTES = 1024 * 1024 * 10; // 10 MB
+
+// Kill the Python script together with any tesseract process it started
+function killProcessTree(child) {
+  try {
+    if (process.platform === 'win32') {
+      spawn('taskkill', ['/pid', String(child.pid), '/T', '/F'], { windowsHide: true });
+    } else {
+      // The child leads its own process group (see `detached` below)
+      process.kill(-child.pid, 'SIGKILL');
+    }
+  } catch (killError) {
+    console.error('Failed to kill OCR process:', killError);
+  }
+}
+
+// Run the OCR script, resolving with its output or with timedOut set if it
+// overran its time budget and had to be killed
+function runOcrScript(scriptPath, args) {
+  return new Promise((resolve, reject) => {
+    const child = spawn('python', [scriptPath, ...args], {
+      detached: process.platform !== 'win32',
+      windowsHide: true,
+      env: { ...process.env, OCR_TIME_BUDGET: String(OCR_TIME_BUDGET) },
+    });
+
+    const stdoutChunks = [];
+    let stdoutBytes = 0;
+    let stderr = '';
+    let timedOut = false;
+    let overflowed = false;
+
+    const timer = setTimeout(() => {
+      timedOut = true;
+      killProcessTree(child);
+    }, OCR_PROCESS_TIMEOUT_MS);
+
+    child.stdout.on('data', (chunk) => {
+      stdoutChunks.push(chunk);
+      stdoutBytes += chunk.length;
+      if (stdoutBytes > OCR_MAX_OUTPUT_BYTES && !overflowed) {
+        overflowed = true;
+        killProcessTree(child);
+      }
+    });
+    child.stderr.on('data', (chunk) => {
+      stderr += chunk;
+    });
+
+    child.on('error', (error) => {
+      clearTimeout(timer);
+      reject(error);
+    });
+    child.on('close', (code) => {
+      clearTimeout(timer);
+      // Decode once at the end so multi-byte characters split across
+      // chunks come through intact
+      const stdout = Buffer.concat(stdoutChunks).toString('utf8');
+      if (timedOut) {
+        resolve({ stdout, stderr, timedOut: true });
+      } else if (overflowed) {
+        reject(new Error('Python script output exceeded the maximum size'));
+      } else if (code !== 0) {
+        reject(new Error(`Python script exited with code ${code}: ${stderr || stdout}`));
+      } else {
+        resolve({ stdout, stderr, timedOut: false });
+      }
+    });
+  });
+}
+
 export default async function handler(req, res) {
   if (req.method !== 'POST') {
     return res.status(405).json({ error: 'Method not allowed' });
@@ -71,23 +150,23 @@ export default async function handler(req, res) {
     }
     
     // Log the exact command being executed
-    const command = `python "${scriptPath}" "${savedFilePath}" "${pythonDocType}"`;
-    console.log(`Executing command: ${command}`);
+    console.log(`Executing command: python "${scriptPath}" "${savedFilePath}" "${pythonDocType}"`);
     
     // Execute Python script
-    const { stdout, stderr } = await new Promise((resolve, reject) => {
-      exec(
-        command,
-        { maxBuffer: 1024 * 1024 * 10 }, // 10 MB buffer
-        (error, stdout, stderr) => {
-          if (error) {
-            console.error('Python execution error:', error);
-            reject(error);
-          }
-          resolve({ stdout, stderr });
-        }
-      );
-    });
+    const { stdout, stderr, timedOut } = await runOcrScript(scriptPath, [savedFilePath, pythonDocType])
+      .catch((error) => {
+        console.error('Python execution error:', error);
+        throw error;
+      });
+
+    // The script overran its own budget and was killed
+    if (timedOut) {
+      console.error('Python script timed out after', OCR_PROCESS_TIMEOUT_MS, 'ms');
+      return res.status(200).json({
+        success: true,
+        data: { error: 'Document processing timed out', timed_out: true }
+      });
+    }
 
     // Log the raw output
     console.log('Python stdout:', stdout);